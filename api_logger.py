@@ -1,12 +1,172 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional
 import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from contextvars import ContextVar
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Directory for the on-disk log history, one NDJSON file per IST day
+HISTORY_DIR = "logs"
+DEFAULT_HISTORY_RETENTION_DAYS = 7
+HISTORY_FILE_PATTERN = re.compile(r"api-(\d{4}-\d{2}-\d{2})\.ndjson")
+
+# Number of entries or bytes per chunk when streaming exports
+EXPORT_CHUNK_ENTRIES = 200
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Id of the request entry being handled, attached to the TastyTrade calls it makes
+current_request_id: ContextVar[Optional[int]] = ContextVar("current_request_id", default=None)
+
+# Entry types shown by each dashboard tab
+LOG_KINDS = {
+    "webhook": ("request", "response"),
+    "tastytrade": ("tastytrade_api",),
+}
+
+def _history_retention_days() -> int:
+    """Days of history kept on disk, including today, from LOG_HISTORY_DAYS."""
+    value = os.getenv("LOG_HISTORY_DAYS")
+    if value is None:
+        return DEFAULT_HISTORY_RETENTION_DAYS
+    try:
+        days = int(value)
+    except ValueError:
+        logger.warning(f"Invalid LOG_HISTORY_DAYS {value!r}, keeping {DEFAULT_HISTORY_RETENTION_DAYS} days of history")
+        return DEFAULT_HISTORY_RETENTION_DAYS
+    return max(days, 1)
+
+HISTORY_RETENTION_DAYS = _history_retention_days()
+
+# Potentially large fields left out of page summaries
+DETAIL_FIELDS = ("payload", "request_data", "response_data", "error")
+
+def encode_json(data: Dict) -> bytes:
+    """Encode a log entry or response body as compact JSON."""
+    try:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # orjson rejects some valid data, e.g. integers over 64 bits
+        return json.dumps(data, default=str).encode()
+
+def summarize_entry(log: Dict) -> Dict:
+    """Copy of a log entry without its payload fields, plus a one-line summary."""
+    summary = {k: v for k, v in log.items() if k not in DETAIL_FIELDS}
+    payload = log.get("payload")
+    text = ""
+    if isinstance(payload, dict):
+        if log.get("type") == "request":
+            text = str(payload.get("signal") or ("batch" if "legs" in payload else ""))
+        else:
+            text = str(payload.get("status") or "")
+            if payload.get("message"):
+                text += f": {payload['message']}"
+    summary["summary"] = text
+    return summary
+
+def history_path(date: str) -> str:
+    """Path of the history file for an IST date (YYYY-MM-DD)."""
+    return os.path.join(HISTORY_DIR, f"api-{date}.ndjson")
+
+class HistoryWriter:
+    """Appends encoded entries to the per-day history files from a background thread."""
+    
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._date: Optional[str] = None
+        
+    def write(self, date: str, encoded: bytes) -> None:
+        """Queue an encoded entry for the history file of an IST date."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-history", daemon=True)
+            self._thread.start()
+        self._queue.put((date, encoded))
+        
+    def close(self) -> None:
+        """Write out queued entries and close the current file."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+        
+    def _run(self) -> None:
+        while True:
+            # Drain everything queued so a burst costs one flush
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for item in batch:
+                if item is None:
+                    self._close_file()
+                    return
+                self._write(*item)
+            
+            if self._file:
+                try:
+                    self._file.flush()
+                except OSError as e:
+                    logger.warning(f"Could not write log history: {str(e)}")
+                    
+    def _write(self, date: str, encoded: bytes) -> None:
+        try:
+            if self._date != date:
+                self._close_file()
+                os.makedirs(HISTORY_DIR, exist_ok=True)
+                self._file = open(history_path(date), "ab")
+                self._date = date
+                self._prune(date)
+            self._file.write(encoded + b"\n")
+        except OSError as e:
+            logger.warning(f"Could not write log history: {str(e)}")
+            self._close_file()
+            
+    def _close_file(self) -> None:
+        if self._file:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._date = None
+        
+    def _prune(self, today: str) -> None:
+        """Delete history files older than the retention period."""
+        days = max(HISTORY_RETENTION_DAYS, 1)
+        cutoff = (datetime.strptime(today, '%Y-%m-%d') - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        for name in os.listdir(HISTORY_DIR):
+            match = HISTORY_FILE_PATTERN.fullmatch(name)
+            # Never touch the file being opened, whatever the retention
+            if match and match.group(1) < cutoff and match.group(1) < today:
+                try:
+                    os.remove(os.path.join(HISTORY_DIR, name))
+                    logger.info(f"Removed old log history: {name}")
+                except OSError as e:
+                    logger.warning(f"Could not remove old log history {name}: {str(e)}")
 
 class APILogger:
     def __init__(self):
         self.logs: List[Dict] = []
         self.max_logs = 1000  # Keep last 1000 logs
+        # Encoded form of each entry in self.logs, so polls don't re-serialize the buffer
+        self._encoded: List[bytes] = []
+        # Monotonic entry ids, used as pagination cursors. Seeded from the clock in
+        # microseconds so they keep increasing across restarts (and stay exact in JavaScript)
+        self._next_id = time.time_ns() // 1000
+        self._history = HistoryWriter()
         
     def _get_ist_time(self) -> str:
         """Get current time in IST."""
@@ -23,8 +183,8 @@ class APILogger:
             "method": method,
             "payload": payload
         }
-        self.logs.append(log_entry)
-        self._trim_logs()
+        self._append(log_entry)
+        current_request_id.set(log_entry["id"])
         
     def log_response(self, endpoint: str, method: str, payload: Dict) -> None:
         """Log API response."""
@@ -35,8 +195,7 @@ class APILogger:
             "method": method,
             "payload": payload
         }
-        self.logs.append(log_entry)
-        self._trim_logs()
+        self._append(log_entry)
         
     def log_tastytrade_api(self, endpoint: str, method: str, request_data: Dict = None, response_data: Dict = None, error: str = None) -> None:
         """Log TastyTrade API call."""
@@ -48,16 +207,132 @@ class APILogger:
             "request_data": request_data,
             "response_data": response_data,
             "error": error,
-            "status": "error" if error else "success"
+            "status": "error" if error else "success",
+            "request_id": current_request_id.get()
         }
+        self._append(log_entry)
+        
+    def _append(self, log_entry: Dict) -> None:
+        """Add an entry to the buffer and the on-disk history."""
+        log_entry["id"] = self._next_id
+        self._next_id += 1
+        try:
+            encoded = encode_json(log_entry)
+        except Exception as e:
+            # Logging must never fail the request being logged
+            logger.warning(f"Could not encode log entry: {str(e)}")
+            encoded = encode_json({k: str(v) for k, v in log_entry.items()})
         self.logs.append(log_entry)
+        self._encoded.append(encoded)
         self._trim_logs()
+        self._history.write(log_entry["timestamp"][:10], encoded)
+        
+    def close(self) -> None:
+        """Flush and close the on-disk history."""
+        self._history.close()
         
     def _trim_logs(self) -> None:
         """Keep only the most recent logs."""
         if len(self.logs) > self.max_logs:
             self.logs = self.logs[-self.max_logs:]
+            self._encoded = self._encoded[-self.max_logs:]
             
     def get_logs(self) -> List[Dict]:
         """Get all logs."""
-        return self.logs 
\ No newline at end of file
+        return self.logs
+        
+    def get_logs_json(self, log_type: str = None) -> bytes:
+        """Get logs as an encoded JSON array, optionally filtered by type."""
+        if log_type is None:
+            encoded = self._encoded
+        else:
+            encoded = [e for log, e in zip(self.logs, self._encoded) if log.get("type") == log_type]
+        return b"[" + b",".join(encoded) + b"]"
+        
+    def _position(self, log_id: int) -> int:
+        """Index of the first buffered entry with an id >= log_id."""
+        # Ids increase along the buffer, so the position can be bisected
+        lo, hi = 0, len(self.logs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.logs[mid]["id"] < log_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+        
+    def get_entry(self, log_id: int) -> Optional[Dict]:
+        """Get a buffered entry by id, or None if it has been trimmed."""
+        index = self._position(log_id)
+        if index < len(self.logs) and self.logs[index]["id"] == log_id:
+            return self.logs[index]
+        return None
+        
+    def get_page(self, kind: str = None, before: int = None, limit: int = 20) -> Dict:
+        """Get a page of log summaries, newest first, older than the entry id `before`.
+
+        kind restricts the page to one of LOG_KINDS. Items leave out the
+        payload fields, which are fetched by id with get_entry. The returned
+        next_before is the cursor for the following page, or None on the last page.
+        """
+        end = len(self.logs) if before is None else self._position(before)
+        
+        types = LOG_KINDS.get(kind)
+        items = []
+        for log in reversed(self.logs[:end]):
+            if types is None or log.get("type") in types:
+                items.append(summarize_entry(log))
+                if len(items) == limit:
+                    break
+        
+        return {
+            "items": items,
+            "next_before": items[-1]["id"] if len(items) == limit else None
+        }
+        
+    def get_stats(self) -> Dict:
+        """Get dashboard counters for the current buffer."""
+        stats = {
+            "total_requests": 0,
+            "successful_trades": 0,
+            "failed_trades": 0,
+            "tastytrade_calls": 0
+        }
+        for log in self.logs:
+            log_type = log.get("type")
+            if log_type == "request":
+                stats["total_requests"] += 1
+            elif log_type == "response":
+                payload = log.get("payload")
+                status = payload.get("status") if isinstance(payload, dict) else None
+                if status == "success":
+                    stats["successful_trades"] += 1
+                elif status == "error":
+                    stats["failed_trades"] += 1
+            elif log_type == "tastytrade_api":
+                stats["tastytrade_calls"] += 1
+        return stats
+        
+    def iter_ndjson(self) -> Iterator[bytes]:
+        """Stream the in-memory buffer as NDJSON chunks."""
+        # Snapshot so entries logged while streaming don't shift the iteration
+        encoded = list(self._encoded)
+        for start in range(0, len(encoded), EXPORT_CHUNK_ENTRIES):
+            yield b"\n".join(encoded[start:start + EXPORT_CHUNK_ENTRIES]) + b"\n"
+            
+    @staticmethod
+    def history_path(date: str) -> str:
+        """Path of the history file for an IST date (YYYY-MM-DD)."""
+        return history_path(date)
+        
+    def iter_history(self, date: str) -> Iterator[bytes]:
+        """Stream the on-disk history for an IST date (YYYY-MM-DD) in chunks."""
+        path = self.history_path(date)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(EXPORT_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
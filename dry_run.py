@@ -0,0 +1,91 @@
+"""
+Stand-in TastyTrade client used when BROKER_DRY_RUN is set.
+Answers the calls made by trading_logic locally, so no login or order reaches TastyTrade.
+Positions are tracked from the orders it fills, so closes and rotations behave as they would live.
+"""
+
+import itertools
+import logging
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cash balance and quote price reported by the dry-run broker
+DRY_RUN_CASH_BALANCE = 100000.0
+DRY_RUN_PRICE = 100.0
+
+def dry_run_enabled() -> bool:
+    """Check if the service is configured to use the dry-run broker."""
+    return os.getenv("BROKER_DRY_RUN", "").lower() in ("1", "true", "yes")
+
+def parse_positions(value: str) -> Dict[str, int]:
+    """Parse seed positions in the form "MSTU:10,MSTZ:5"."""
+    positions = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        symbol, _, quantity = item.partition(":")
+        try:
+            positions[symbol.strip().upper()] = int(quantity)
+        except ValueError:
+            logger.warning(f"Ignoring invalid dry-run position: {item.strip()}")
+    return positions
+
+class DryRunAPI:
+    def __init__(self, positions: Optional[Dict[str, int]] = None):
+        self._order_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.positions: Dict[str, int] = dict(positions or {})
+
+    def get(self, path: str, params=None, data=None) -> Dict:
+        """Answer a TastyTrade API call with a canned response."""
+        if path == "/accounts":
+            return {"items": [{"account": {"account-number": "DRYRUN"}}]}
+        if path == "/orders":
+            return self._fill_order(data or {})
+        if path == "/quotes":
+            symbols = [value for key, value in (params or []) if key == "symbol[]"]
+            return {"items": [{"symbol": symbol, "last": DRY_RUN_PRICE} for symbol in symbols]}
+        if re.fullmatch(r"/accounts/[^/]+/positions", path):
+            with self._lock:
+                items = [{"symbol": symbol, "quantity": quantity}
+                         for symbol, quantity in self.positions.items() if quantity]
+            return {"items": items}
+        if re.fullmatch(r"/accounts/[^/]+/balances", path):
+            return {"cash-balance": str(DRY_RUN_CASH_BALANCE)}
+        if re.fullmatch(r"/accounts/[^/]+/orders/[^/]+", path):
+            return {"status": "Filled"}
+        return {}
+
+    def _fill_order(self, order: Dict) -> Dict:
+        """Fill an order immediately and apply it to the simulated positions."""
+        symbol = order.get("symbol")
+        quantity = int(order.get("quantity", 0))
+        sign = 1 if order.get("side") == "Buy" else -1
+        with self._lock:
+            self.positions[symbol] = self.positions.get(symbol, 0) + sign * quantity
+            return {"order-id": str(next(self._order_ids))}
+
+class DryRunTastytrade:
+    """Drop-in replacement for tastytrade_sdk.Tastytrade that never places orders."""
+
+    def __init__(self, positions: Optional[Dict[str, int]] = None):
+        self.api = DryRunAPI(positions)
+
+    def login(self, login: str = None, password: str = None) -> None:
+        pass
+
+_client: Optional[DryRunTastytrade] = None
+
+def get_dry_run_client() -> DryRunTastytrade:
+    """Shared dry-run client, so simulated positions persist across signals.
+
+    Seed positions are read from BROKER_DRY_RUN_POSITIONS ("MSTU:10,MSTZ:5").
+    """
+    global _client
+    if _client is None:
+        _client = DryRunTastytrade(parse_positions(os.getenv("BROKER_DRY_RUN_POSITIONS", "")))
+    return _client
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from datetime import datetime
@@ -8,9 +9,11 @@ import json
 import os
 from typing import List, Dict
 import logging
-from trading_logic import handle_trading_signal, api_logger
+from api_logger import LOG_KINDS, encode_json
+from trading_logic import handle_trading_signal, handle_batch_signal, parse_legs, api_logger
 from health import get_health_status
 from init import init_app
+from dry_run import dry_run_enabled
 
 # Last updated: March 27, 2023
 
@@ -30,6 +33,9 @@ API_VERSION = "1.1.0"
 # Create FastAPI app 
 app = FastAPI(title="TastyTrade Webhook Service")
 
+# Compress larger responses (log polls, exports); small webhook replies are left as is
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Mount static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
@@ -38,10 +44,26 @@ templates = Jinja2Templates(directory="templates")
 last_trade_time = None
 TRADE_COOLDOWN_HOURS = 12
 
+# Dashboard pagination
+DASHBOARD_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush the on-disk log history."""
+    api_logger.close()
+
 @app.get("/version")
 async def version():
     """Return the API version."""
-    return {"version": API_VERSION}
+    return {"version": API_VERSION, "dry_run": dry_run_enabled()}
+
+def in_cooldown() -> bool:
+    """Check if we're in the cooldown period after a trade."""
+    if not last_trade_time:
+        return False
+    time_since_last_trade = (datetime.now(pytz.UTC) - last_trade_time).total_seconds() / 3600
+    return time_since_last_trade < TRADE_COOLDOWN_HOURS
 
 @app.post("/webhook")
 async def webhook(request: Request):
@@ -54,18 +76,20 @@ async def webhook(request: Request):
         # Log incoming webhook
         api_logger.log_request("webhook", "POST", body)
         
+        # Batch payloads carry a list of legs instead of a signal
+        if "legs" in body:
+            return await batch_webhook(body.get("legs"))
+        
         if signal not in ["long", "short"]:
             response = {"status": "error", "message": "Invalid signal"}
             api_logger.log_response("webhook", "POST", response)
             return response
             
         # Check if we're in cooldown period
-        if last_trade_time:
-            time_since_last_trade = (datetime.now(pytz.UTC) - last_trade_time).total_seconds() / 3600
-            if time_since_last_trade < TRADE_COOLDOWN_HOURS:
-                response = {"status": "cooldown", "message": "Trading is in cooldown period"}
-                api_logger.log_response("webhook", "POST", response)
-                return response
+        if in_cooldown():
+            response = {"status": "cooldown", "message": "Trading is in cooldown period"}
+            api_logger.log_response("webhook", "POST", response)
+            return response
         
         # Handle trading signal
         result = await handle_trading_signal(signal)
@@ -83,25 +107,104 @@ async def webhook(request: Request):
         api_logger.log_response("webhook", "POST", response)
         return response
 
+async def batch_webhook(legs) -> Dict:
+    """Handle a batch webhook payload: {"legs": [{"symbol", "side", "quantity"}, ...]}."""
+    global last_trade_time
+    try:
+        legs = parse_legs(legs)
+    except ValueError as e:
+        response = {"status": "error", "message": f"Invalid legs: {str(e)}"}
+        api_logger.log_response("webhook", "POST", response)
+        return response
+    
+    if in_cooldown():
+        response = {"status": "cooldown", "message": "Trading is in cooldown period"}
+        api_logger.log_response("webhook", "POST", response)
+        return response
+    
+    result = await handle_batch_signal(legs)
+    
+    # Any executed leg counts as a trade for the cooldown
+    if result.get("status") in ["success", "partial"]:
+        last_trade_time = datetime.now(pytz.UTC)
+    
+    api_logger.log_response("webhook", "POST", result)
+    return result
+
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
-    logs = api_logger.get_logs()
+    # Render only the newest page of each tab; the rest is loaded on scroll
     return templates.TemplateResponse(
         "dashboard.html",
-        {"request": request, "logs": logs}
+        {
+            "request": request,
+            "page_size": DASHBOARD_PAGE_SIZE,
+            "stats": api_logger.get_stats(),
+            "webhook_page": api_logger.get_page("webhook", limit=DASHBOARD_PAGE_SIZE),
+            "tastytrade_page": api_logger.get_page("tastytrade", limit=DASHBOARD_PAGE_SIZE)
+        }
     )
 
 @app.get("/api/logs")
 async def get_logs():
     """Get all API logs."""
-    return api_logger.get_logs()
+    return Response(content=api_logger.get_logs_json(), media_type="application/json")
 
 @app.get("/api/tastytrade-logs")
 async def get_tastytrade_logs():
     """Get only TastyTrade API logs."""
-    all_logs = api_logger.get_logs()
-    tastytrade_logs = [log for log in all_logs if log.get("type") == "tastytrade_api"]
-    return tastytrade_logs
+    return Response(content=api_logger.get_logs_json("tastytrade_api"), media_type="application/json")
+
+@app.get("/api/logs/page")
+async def get_logs_page(kind: str = None, before: int = None, limit: int = DASHBOARD_PAGE_SIZE):
+    """Get a page of logs, newest first, older than the entry id `before`."""
+    if kind is not None and kind not in LOG_KINDS:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"Invalid kind, expected one of: {', '.join(LOG_KINDS)}"}
+        )
+    
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    page = api_logger.get_page(kind, before, limit)
+    page["stats"] = api_logger.get_stats()
+    return Response(content=encode_json(page), media_type="application/json")
+
+@app.get("/api/logs/entries/{log_id}")
+async def get_log_entry(log_id: int):
+    """Get a single log entry, including its payload."""
+    entry = api_logger.get_entry(log_id)
+    if entry is None:
+        return JSONResponse(
+            status_code=404,
+            content={"status": "error", "message": "Log entry is no longer in the buffer"}
+        )
+    return Response(content=encode_json(entry), media_type="application/json")
+
+@app.get("/api/logs/export")
+async def export_logs(date: str = None):
+    """Stream logs as NDJSON: the in-memory buffer, or the on-disk history for an IST date (YYYY-MM-DD)."""
+    if date is None:
+        return StreamingResponse(api_logger.iter_ndjson(), media_type="application/x-ndjson")
+    
+    try:
+        datetime.strptime(date, '%Y-%m-%d')
+    except ValueError:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": "Invalid date, expected YYYY-MM-DD"}
+        )
+    
+    if not os.path.exists(api_logger.history_path(date)):
+        return JSONResponse(
+            status_code=404,
+            content={"status": "error", "message": f"No log history for {date}"}
+        )
+    
+    return StreamingResponse(
+        api_logger.iter_history(date),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="api-{date}.ndjson"'}
+    )
 
 @app.get("/api/test")
 async def test_endpoint():
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Replay recorded webhook traffic against a running instance of the service.
+Used to check that changes to the webhook hot path hold up under real alert patterns.
+
+Accepted inputs:
+- NDJSON: one JSON object per line, either a raw webhook payload
+  ({"signal": "long"}, optionally with a "timestamp") or an APILogger entry
+- Exported logs: the JSON array returned by /api/logs
+
+Only webhook request entries are replayed from exported logs; responses and
+TastyTrade API entries are ignored.
+
+Note that cooldown is evaluated by the server against its own clock, so an
+accelerated replay will see more cooldown decisions than the original traffic did.
+
+The target service places real orders unless it runs with BROKER_DRY_RUN set.
+Replay refuses to run against a live service unless --i-understand-this-places-orders
+is given.
+"""
+
+import argparse
+import http.client
+import json
+import math
+import socket
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import pytz
+
+DEFAULT_BASE_URL = "http://localhost:8000"
+REQUEST_TIMEOUT_SECONDS = 60
+DEFAULT_CONCURRENCY = 32
+
+# Errors a request can fail with: connection refused or reset, timeouts,
+# malformed responses (urllib.error.URLError is an OSError)
+REQUEST_ERRORS = (OSError, http.client.HTTPException, ValueError)
+
+# Webhook response status -> decision reported by the replay
+DECISIONS = {
+    "success": "executed",
+    "cooldown": "cooldown",
+    "info": "dedup",
+    "error": "error",
+    "timeout": "timeout",
+}
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Parse an APILogger ('%Y-%m-%d %H:%M:%S IST') or ISO 8601 timestamp as naive UTC."""
+    if not isinstance(value, str):
+        return None
+    try:
+        ist = pytz.timezone('Asia/Kolkata')
+        parsed = ist.localize(datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S'))
+        return parsed.astimezone(pytz.UTC).replace(tzinfo=None)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # ISO timestamps without an offset are taken to be UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(pytz.UTC).replace(tzinfo=None)
+    return parsed
+
+def _to_signal(record: Dict) -> Optional[Dict]:
+    """Convert a recorded object into a replayable signal, or None to skip it."""
+    if not isinstance(record, dict):
+        return None
+
+    # APILogger entry
+    if "type" in record and "endpoint" in record:
+        if record.get("type") != "request" or record.get("endpoint") != "webhook":
+            return None
+        return {
+            "timestamp": parse_timestamp(record.get("timestamp")),
+            "payload": record.get("payload") or {}
+        }
+
+    # Raw webhook payload
+    payload = {k: v for k, v in record.items() if k != "timestamp"}
+    return {
+        "timestamp": parse_timestamp(record.get("timestamp")),
+        "payload": payload
+    }
+
+def load_signals(path: str) -> List[Dict]:
+    """Load recorded webhook signals from an NDJSON file or an exported log array."""
+    with open(path) as f:
+        content = f.read()
+
+    stripped = content.lstrip()
+    if stripped.startswith('['):
+        records = json.loads(stripped)
+    else:
+        records = []
+        for line_number, line in enumerate(content.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {str(e)}")
+
+    signals = [s for s in (_to_signal(r) for r in records) if s is not None]
+
+    # Exported logs can be out of order if several exports were concatenated
+    if all(s["timestamp"] is not None for s in signals):
+        signals.sort(key=lambda s: s["timestamp"])
+    return signals
+
+def _http(method: str, url: str, body: Optional[Dict] = None):
+    """Make an HTTP call and return the decoded JSON response."""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    req.add_header("Content-Type", "application/json")
+    with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT_SECONDS) as resp:
+        return json.loads(resp.read().decode())
+
+def _get_ndjson(url: str) -> List[Dict]:
+    """Fetch an NDJSON response and decode its lines."""
+    with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT_SECONDS) as resp:
+        return [json.loads(line) for line in resp.read().decode().splitlines() if line.strip()]
+
+def count_broker_calls(entries: List[Dict]) -> Dict[int, int]:
+    """Count completed TastyTrade API calls per webhook request entry id.
+
+    safe_api_call logs each call twice: once before the request and once with
+    its response or error. Only the second entry is counted.
+    """
+    counts: Dict[int, int] = {}
+    for e in entries:
+        if e.get("type") != "tastytrade_api" or e.get("request_id") is None:
+            continue
+        if e.get("response_data") is not None or e.get("error"):
+            counts[e["request_id"]] = counts.get(e["request_id"], 0) + 1
+    return counts
+
+def attribute_broker_calls(results: List[Dict], entries: List[Dict]) -> None:
+    """Fill in broker_calls on each result from the service's log buffer.
+
+    Each replayed payload carries a replay_id, which finds its webhook request
+    entry; TastyTrade calls are tagged with the id of the request that made them.
+    Signals whose request entry has already been trimmed from the buffer are left as None.
+    """
+    request_ids = {}
+    for e in entries:
+        payload = e.get("payload")
+        if e.get("type") == "request" and isinstance(payload, dict) and "replay_id" in payload:
+            request_ids[payload["replay_id"]] = e.get("id")
+
+    counts = count_broker_calls(entries)
+    for r in results:
+        request_id = request_ids.get(r["replay_id"])
+        if request_id is not None:
+            r["broker_calls"] = counts.get(request_id, 0)
+
+def _delay(previous: Optional[datetime], current: Optional[datetime], speed: float) -> float:
+    """Seconds to wait before sending the next signal."""
+    if speed <= 0 or previous is None or current is None:
+        return 0.0
+    return max((current - previous).total_seconds(), 0.0) / speed
+
+def _ist_now() -> datetime:
+    """Current time in IST, the timezone the service names its history files by."""
+    return datetime.now(pytz.UTC).astimezone(pytz.timezone('Asia/Kolkata'))
+
+def _is_timeout(error: Exception) -> bool:
+    """Check if a request error, or the error urllib wrapped, is a timeout."""
+    reason = getattr(error, "reason", None)
+    return any(isinstance(e, (TimeoutError, socket.timeout)) for e in (error, reason))
+
+def _send(base_url: str, index: int, signal: Dict, replay_id: str) -> Dict:
+    """Send one signal to the webhook and time the response."""
+    payload = dict(signal["payload"]) if isinstance(signal["payload"], dict) else {}
+    payload["replay_id"] = replay_id
+
+    sent_at = time.monotonic()
+    try:
+        response = _http("POST", f"{base_url}/webhook", payload)
+    except REQUEST_ERRORS as e:
+        status = "timeout" if _is_timeout(e) else "error"
+        response = {"status": status, "message": f"Request failed: {type(e).__name__}: {str(e)}"}
+    latency_ms = (time.monotonic() - sent_at) * 1000
+
+    status = response.get("status") if isinstance(response, dict) else None
+    return {
+        "index": index,
+        "replay_id": replay_id,
+        "timestamp": signal["timestamp"].isoformat() if signal["timestamp"] else None,
+        "payload": signal["payload"],
+        "status": status,
+        "decision": DECISIONS.get(status, status or "unknown"),
+        "message": response.get("message") if isinstance(response, dict) else None,
+        "latency_ms": round(latency_ms, 2),
+        "broker_calls": None
+    }
+
+def replay(signals: List[Dict], base_url: str, speed: float, track_broker_calls: bool = True,
+           concurrency: int = DEFAULT_CONCURRENCY) -> List[Dict]:
+    """Send recorded signals to the webhook and collect per-signal results.
+
+    speed is a multiplier on the recorded gaps between signals: 1 replays in
+    real time, 60 replays an hour per minute, 0 sends everything at once.
+    Sends are dispatched on schedule from a thread pool, so overlapping
+    signals in the recording overlap against the service too.
+    """
+    base_url = base_url.rstrip('/')
+    run_id = uuid.uuid4().hex[:8]
+    previous_timestamp = None
+    scheduled = 0.0
+    futures = []
+    run_started = _ist_now()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.monotonic()
+        for index, signal in enumerate(signals):
+            # Schedule against the start time, independent of earlier responses
+            scheduled += _delay(previous_timestamp, signal["timestamp"], speed)
+            previous_timestamp = signal["timestamp"] or previous_timestamp
+            wait = scheduled - (time.monotonic() - started)
+            if wait > 0:
+                time.sleep(wait)
+            futures.append(executor.submit(_send, base_url, index, signal, f"{run_id}-{index}"))
+
+    results = [future.result() for future in futures]
+
+    if track_broker_calls:
+        try:
+            attribute_broker_calls(results, _get_ndjson(f"{base_url}/api/logs/export"))
+            # Long replays overflow the in-memory buffer; fall back to the day's history
+            if any(r["broker_calls"] is None for r in results):
+                for date in sorted({run_started.strftime('%Y-%m-%d'), _ist_now().strftime('%Y-%m-%d')}):
+                    try:
+                        entries = _get_ndjson(f"{base_url}/api/logs/export?date={date}")
+                    except urllib.error.HTTPError as e:
+                        if e.code == 404:
+                            continue
+                        raise
+                    attribute_broker_calls(results, entries)
+        except REQUEST_ERRORS as e:
+            print(f"Could not fetch service logs: {str(e)}", file=sys.stderr)
+
+    return results
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+def summarize(results: List[Dict]) -> Dict:
+    """Aggregate latency, decision and broker call statistics."""
+    latencies = [r["latency_ms"] for r in results]
+    decisions = {}
+    for r in results:
+        decisions[r["decision"]] = decisions.get(r["decision"], 0) + 1
+
+    broker_calls = [r["broker_calls"] for r in results if r["broker_calls"] is not None]
+    summary = {
+        "signals": len(results),
+        "decisions": decisions,
+        "latency_ms": None,
+        "broker_calls": None
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "min": min(latencies),
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": max(latencies),
+            "mean": round(sum(latencies) / len(latencies), 2)
+        }
+    if broker_calls:
+        summary["broker_calls"] = {
+            "total": sum(broker_calls),
+            "per_signal": round(sum(broker_calls) / len(broker_calls), 2),
+            "max": max(broker_calls)
+        }
+    return summary
+
+def print_report(results: List[Dict], summary: Dict) -> None:
+    """Print a human readable report."""
+    print(f"{'#':>4}  {'recorded at':<19}  {'signal':<8}  {'decision':<9}  {'latency ms':>10}  {'broker calls':>12}")
+    for r in results:
+        signal = str(r["payload"].get("signal", "")) if isinstance(r["payload"], dict) else ""
+        broker_calls = "-" if r["broker_calls"] is None else str(r["broker_calls"])
+        print(f"{r['index']:>4}  {(r['timestamp'] or '-')[:19]:<19}  {signal:<8}  {r['decision']:<9}  "
+              f"{r['latency_ms']:>10.2f}  {broker_calls:>12}")
+
+    print()
+    print(f"Signals: {summary['signals']}")
+    print("Decisions: " + ", ".join(f"{k}={v}" for k, v in sorted(summary["decisions"].items())))
+    if summary["latency_ms"]:
+        latency = summary["latency_ms"]
+        print(f"Latency ms: min={latency['min']} p50={latency['p50']} p95={latency['p95']} "
+              f"max={latency['max']} mean={latency['mean']}")
+    if summary["broker_calls"]:
+        calls = summary["broker_calls"]
+        print(f"Broker calls: total={calls['total']} per_signal={calls['per_signal']} max={calls['max']}")
+
+def parse_speed(value: str) -> float:
+    """Parse --speed: 'max' for no delay, otherwise a positive multiplier."""
+    if value == "max":
+        return 0.0
+    try:
+        speed = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid speed: {value}")
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive, or 'max'")
+    return speed
+
+def _int_at_least(minimum: int):
+    """argparse type for integers no smaller than minimum."""
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid integer: {value}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}")
+        return number
+    return parse
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded webhook traffic against the service.")
+    parser.add_argument("input", help="NDJSON capture or exported /api/logs JSON")
+    parser.add_argument("--url", default=DEFAULT_BASE_URL, help=f"Service base URL (default: {DEFAULT_BASE_URL})")
+    parser.add_argument("--speed", type=parse_speed, default=1.0,
+                        help="Replay speed: 1 for real time, N to accelerate, 'max' for no delay (default: 1)")
+    parser.add_argument("--limit", type=_int_at_least(0), help="Replay only the first N signals")
+    parser.add_argument("--concurrency", type=_int_at_least(1), default=DEFAULT_CONCURRENCY,
+                        help=f"Maximum signals in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--no-broker-calls", action="store_true",
+                        help="Don't fetch the service logs to count broker calls per signal")
+    parser.add_argument("--i-understand-this-places-orders", dest="allow_live", action="store_true",
+                        help="Allow replaying against a service that is not in dry-run mode")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    signals = load_signals(args.input)
+    if args.limit is not None:
+        signals = signals[:args.limit]
+    if not signals:
+        print("No webhook signals found in input", file=sys.stderr)
+        return 1
+
+    try:
+        dry_run = _http("GET", f"{args.url.rstrip('/')}/version").get("dry_run", False)
+    except REQUEST_ERRORS as e:
+        print(f"Could not reach service: {str(e)}", file=sys.stderr)
+        return 1
+    if not dry_run and not args.allow_live:
+        print("Service is not running with BROKER_DRY_RUN, so replayed signals would place real orders.\n"
+              "Start it with BROKER_DRY_RUN=true, or pass --i-understand-this-places-orders.", file=sys.stderr)
+        return 1
+
+    results = replay(signals, args.url, args.speed, track_broker_calls=not args.no_broker_calls,
+                     concurrency=args.concurrency)
+    summary = summarize(results)
+
+    if args.json:
+        print(json.dumps({"summary": summary, "results": results}, indent=2))
+    else:
+        print_report(results, summary)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
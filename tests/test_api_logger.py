@@ -0,0 +1,161 @@
+import json
+import os
+
+import pytest
+
+import api_logger
+from api_logger import APILogger
+
+
+def test_log_request_with_integer_over_64_bits(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_logger, "HISTORY_DIR", str(tmp_path))
+    logger = APILogger()
+
+    logger.log_request("webhook", "POST", {"signal": "long", "q": 2 ** 70})
+    logger.close()
+
+    logs = json.loads(logger.get_logs_json())
+    assert logs[0]["payload"] == {"signal": "long", "q": 2 ** 70}
+
+
+def test_history_written_and_closed(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_logger, "HISTORY_DIR", str(tmp_path))
+    logger = APILogger()
+
+    logger.log_request("webhook", "POST", {"signal": "long"})
+    logger.log_response("webhook", "POST", {"status": "success"})
+    logger.close()
+
+    date = logger.get_logs()[0]["timestamp"][:10]
+    lines = b"".join(logger.iter_history(date)).splitlines()
+    assert [json.loads(line)["type"] for line in lines] == ["request", "response"]
+
+
+def test_history_retention(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_logger, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(api_logger, "HISTORY_RETENTION_DAYS", 2)
+    for date in ["2020-01-01", "2099-01-01"]:
+        (tmp_path / f"api-{date}.ndjson").write_bytes(b"{}\n")
+    logger = APILogger()
+
+    logger.log_request("webhook", "POST", {"signal": "long"})
+    logger.close()
+
+    today = logger.get_logs()[0]["timestamp"][:10]
+    assert sorted(os.listdir(tmp_path)) == sorted([f"api-{today}.ndjson", "api-2099-01-01.ndjson"])
+
+
+@pytest.mark.parametrize("value, expected", [(None, 7), ("3", 3), ("0", 1), ("-2", 1), ("abc", 7)])
+def test_history_retention_days_from_env(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("LOG_HISTORY_DAYS", raising=False)
+    else:
+        monkeypatch.setenv("LOG_HISTORY_DAYS", value)
+    assert api_logger._history_retention_days() == expected
+
+
+def test_history_retention_never_deletes_current_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_logger, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(api_logger, "HISTORY_RETENTION_DAYS", 0)
+    logger = APILogger()
+
+    logger.log_request("webhook", "POST", {"signal": "long"})
+    logger.close()
+
+    today = logger.get_logs()[0]["timestamp"][:10]
+    assert os.listdir(tmp_path) == [f"api-{today}.ndjson"]
+
+
+def _filled_logger(tmp_path, monkeypatch, rounds=5):
+    """Logger with `rounds` request/tastytrade/response triples."""
+    monkeypatch.setattr(api_logger, "HISTORY_DIR", str(tmp_path))
+    logger = APILogger()
+    for i in range(rounds):
+        logger.log_request("webhook", "POST", {"signal": "long", "n": i})
+        logger.log_tastytrade_api("/orders", "POST", request_data={"n": i}, response_data={"raw_response": "x" * 100})
+        logger.log_response("webhook", "POST", {"status": "success", "message": f"done {i}"})
+    return logger
+
+
+def test_get_page_cursor_across_kinds(tmp_path, monkeypatch):
+    logger = _filled_logger(tmp_path, monkeypatch)
+    all_ids = [log["id"] for log in logger.get_logs()]
+    webhook_ids = [log["id"] for log in logger.get_logs() if log["type"] in ("request", "response")]
+    tastytrade_ids = [log["id"] for log in logger.get_logs() if log["type"] == "tastytrade_api"]
+
+    for kind, expected in [("webhook", webhook_ids), ("tastytrade", tastytrade_ids), (None, all_ids)]:
+        seen = []
+        before = None
+        while True:
+            page = logger.get_page(kind, before, limit=3)
+            seen.extend(item["id"] for item in page["items"])
+            before = page["next_before"]
+            if before is None:
+                break
+        assert seen == expected[::-1]
+
+
+def test_get_page_next_before_on_final_page(tmp_path, monkeypatch):
+    logger = _filled_logger(tmp_path, monkeypatch)
+
+    page = logger.get_page("tastytrade", limit=10)
+    assert len(page["items"]) == 5
+    assert page["next_before"] is None
+
+    # A full final page points at one more, empty, page
+    page = logger.get_page("tastytrade", limit=5)
+    assert page["next_before"] == page["items"][-1]["id"]
+    assert logger.get_page("tastytrade", page["next_before"], limit=5) == {"items": [], "next_before": None}
+
+
+def test_get_page_after_cursor_trimmed(tmp_path, monkeypatch):
+    logger = _filled_logger(tmp_path, monkeypatch)
+    oldest_id = logger.get_logs()[0]["id"]
+    logger.max_logs = 6
+    logger.log_request("webhook", "POST", {"signal": "short"})
+
+    # The cursor entry is gone; paging continues from whatever is still older
+    assert logger.get_page(None, oldest_id + 1) == {"items": [], "next_before": None}
+    cursor = logger.get_logs()[2]["id"]
+    page = logger.get_page(None, cursor)
+    assert [item["id"] for item in page["items"]] == [log["id"] for log in logger.get_logs()[:2]][::-1]
+
+
+def test_get_entry(tmp_path, monkeypatch):
+    logger = _filled_logger(tmp_path, monkeypatch)
+    first = logger.get_logs()[0]
+    last = logger.get_logs()[-1]
+    assert logger.get_entry(last["id"]) is last
+
+    logger.max_logs = 3
+    logger.log_request("webhook", "POST", {"signal": "short"})
+    assert logger.get_entry(first["id"]) is None
+    assert logger.get_entry(last["id"] + 1000) is None
+
+
+def test_summaries_leave_out_detail_fields(tmp_path, monkeypatch):
+    logger = _filled_logger(tmp_path, monkeypatch, rounds=1)
+    items = logger.get_page(None)["items"]
+
+    for item in items:
+        assert not set(api_logger.DETAIL_FIELDS) & set(item)
+    assert [item["summary"] for item in items] == ["success: done 0", "", "long"]
+    assert "payload" in logger.get_entry(items[0]["id"])
+
+
+def test_get_stats(tmp_path, monkeypatch):
+    logger = _filled_logger(tmp_path, monkeypatch, rounds=2)
+    logger.log_response("webhook", "POST", {"status": "error"})
+    assert logger.get_stats() == {
+        "total_requests": 2,
+        "successful_trades": 2,
+        "failed_trades": 1,
+        "tastytrade_calls": 2
+    }
+
+
+def test_ids_increase_across_restarts(tmp_path, monkeypatch):
+    first = _filled_logger(tmp_path, monkeypatch)
+    second = _filled_logger(tmp_path, monkeypatch)
+    assert second.get_logs()[0]["id"] > first.get_logs()[-1]["id"]
+    assert second.get_logs()[-1]["id"] < 2 ** 53
@@ -0,0 +1,15 @@
+from dry_run import DryRunTastytrade, parse_positions
+
+
+def test_positions_follow_filled_orders():
+    client = DryRunTastytrade({"MSTU": 10})
+
+    client.api.get("/orders", data={"symbol": "MSTU", "side": "Sell", "quantity": 10})
+    client.api.get("/orders", data={"symbol": "MSTZ", "side": "Buy", "quantity": 3})
+
+    positions = client.api.get("/accounts/DRYRUN/positions")["items"]
+    assert positions == [{"symbol": "MSTZ", "quantity": 3}]
+
+
+def test_parse_positions():
+    assert parse_positions("mstu:10, MSTZ:5,bad,") == {"MSTU": 10, "MSTZ": 5}
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+import api_logger
+import main
+
+
+@pytest.fixture(autouse=True)
+def isolated_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_logger, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(main.api_logger, "logs", [])
+    monkeypatch.setattr(main.api_logger, "_encoded", [])
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    return TestClient(main.app)
+
+
+def test_logs_page_route(client):
+    for i in range(3):
+        main.api_logger.log_request("webhook", "POST", {"signal": "long", "n": i})
+        main.api_logger.log_tastytrade_api("/orders", "POST", request_data={"n": i}, response_data={})
+
+    page = client.get("/api/logs/page", params={"kind": "webhook", "limit": 2}).json()
+    assert [item["summary"] for item in page["items"]] == ["long", "long"]
+    assert "payload" not in page["items"][0]
+    assert page["stats"]["total_requests"] == 3
+
+    page = client.get("/api/logs/page", params={"kind": "webhook", "limit": 2, "before": page["next_before"]}).json()
+    assert len(page["items"]) == 1
+    assert page["next_before"] is None
+
+    entry = client.get(f"/api/logs/entries/{page['items'][0]['id']}").json()
+    assert entry["payload"] == {"signal": "long", "n": 0}
+
+
+def test_logs_page_route_rejects_unknown_kind(client):
+    assert client.get("/api/logs/page", params={"kind": "nope"}).status_code == 400
+
+
+@pytest.mark.parametrize("status, starts_cooldown", [("success", True), ("partial", True), ("error", False)])
+def test_batch_webhook_cooldown(monkeypatch, status, starts_cooldown):
+    calls = []
+
+    async def handle_batch_signal(legs):
+        calls.append(legs)
+        return {"status": status, "message": "", "legs": []}
+
+    monkeypatch.setattr(main, "handle_batch_signal", handle_batch_signal)
+    monkeypatch.setattr(main, "last_trade_time", None)
+    legs = [{"symbol": "MSTZ", "side": "buy", "quantity": 1}]
+
+    assert asyncio.run(main.batch_webhook(legs))["status"] == status
+    second = asyncio.run(main.batch_webhook(legs))
+
+    assert (second["status"] == "cooldown") is starts_cooldown
+    assert len(calls) == (1 if starts_cooldown else 2)
@@ -0,0 +1,107 @@
+import argparse
+import json
+import socket
+from datetime import datetime
+
+import pytest
+
+import replay
+
+
+def test_parse_timestamp_ist_iso_and_naive():
+    expected = datetime(2024, 1, 1, 4, 30)
+    assert replay.parse_timestamp("2024-01-01 10:00:00 IST") == expected
+    assert replay.parse_timestamp("2024-01-01T04:30:00Z") == expected
+    assert replay.parse_timestamp("2024-01-01T10:00:00+05:30") == expected
+    assert replay.parse_timestamp("2024-01-01T04:30:00") == expected
+    assert replay.parse_timestamp("not a time") is None
+    assert replay.parse_timestamp(None) is None
+
+
+def test_load_signals_ndjson(tmp_path):
+    path = tmp_path / "capture.ndjson"
+    path.write_text(
+        '{"signal": "short", "timestamp": "2024-01-01T00:00:05Z"}\n'
+        '\n'
+        '{"signal": "long", "timestamp": "2024-01-01T00:00:00Z"}\n'
+    )
+    signals = replay.load_signals(str(path))
+    assert [s["payload"] for s in signals] == [{"signal": "long"}, {"signal": "short"}]
+
+
+def test_load_signals_log_export_keeps_only_webhook_requests(tmp_path):
+    path = tmp_path / "logs.json"
+    path.write_text(json.dumps([
+        {"timestamp": "2024-01-01 10:00:00 IST", "type": "request", "endpoint": "webhook", "payload": {"signal": "long"}},
+        {"timestamp": "2024-01-01 10:00:01 IST", "type": "response", "endpoint": "webhook", "payload": {"status": "success"}},
+        {"timestamp": "2024-01-01 10:00:01 IST", "type": "tastytrade_api", "endpoint": "/orders", "request_data": {}},
+        {"timestamp": "2024-01-01 10:00:02 IST", "type": "request", "endpoint": "other", "payload": {}},
+    ]))
+    signals = replay.load_signals(str(path))
+    assert signals == [{"timestamp": datetime(2024, 1, 1, 4, 30), "payload": {"signal": "long"}}]
+
+
+def test_load_signals_invalid_line(tmp_path):
+    path = tmp_path / "capture.ndjson"
+    path.write_text('{"signal": "long"}\n{oops\n')
+    with pytest.raises(ValueError, match=":2:"):
+        replay.load_signals(str(path))
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([1, 2], 50, 1),
+    ([1, 2, 3, 4, 5, 6], 50, 3),
+    (list(range(1, 101)), 95, 95),
+    ([7], 95, 7),
+    ([3, 1, 2], 100, 3),
+])
+def test_percentile_nearest_rank(values, pct, expected):
+    assert replay._percentile(values, pct) == expected
+
+
+def test_count_and_attribute_broker_calls():
+    entries = [
+        {"id": 10, "type": "request", "payload": {"signal": "long", "replay_id": "run-0"}},
+        {"id": 11, "type": "tastytrade_api", "request_id": 10, "response_data": None, "error": None},
+        {"id": 12, "type": "tastytrade_api", "request_id": 10, "response_data": {"raw_response": "{}"}, "error": None},
+        {"id": 13, "type": "request", "payload": {"signal": "short", "replay_id": "run-1"}},
+        {"id": 14, "type": "tastytrade_api", "request_id": 13, "response_data": None, "error": "boom"},
+        {"id": 15, "type": "request", "payload": {"signal": "long", "replay_id": "run-2"}},
+        {"id": 16, "type": "tastytrade_api", "request_id": None, "response_data": {}, "error": None},
+    ]
+    assert replay.count_broker_calls(entries) == {10: 1, 13: 1}
+
+    results = [{"replay_id": f"run-{i}", "broker_calls": None} for i in range(4)]
+    replay.attribute_broker_calls(results, entries)
+    assert [r["broker_calls"] for r in results] == [1, 1, 0, None]
+
+
+def test_parse_speed():
+    assert replay.parse_speed("max") == 0.0
+    assert replay.parse_speed("60") == 60.0
+    for value in ["0", "-1", "fast"]:
+        with pytest.raises(argparse.ArgumentTypeError):
+            replay.parse_speed(value)
+
+
+@pytest.mark.parametrize("args", [["--concurrency", "0"], ["--limit", "-1"]])
+def test_main_rejects_bad_arguments(tmp_path, args):
+    path = tmp_path / "capture.ndjson"
+    path.write_text('{"signal": "long"}\n')
+    with pytest.raises(SystemExit):
+        replay.main([str(path)] + args)
+
+
+def test_send_records_timeout(monkeypatch):
+    monkeypatch.setattr(replay, "REQUEST_TIMEOUT_SECONDS", 0.2)
+    # Accepts the connection but never answers
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    try:
+        port = server.getsockname()[1]
+        result = replay._send(f"http://127.0.0.1:{port}", 0, {"timestamp": None, "payload": {"signal": "long"}}, "run-0")
+    finally:
+        server.close()
+    assert result["decision"] == "timeout"
+    assert result["latency_ms"] >= 200
@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import trading_logic
+from trading_logic import handle_batch_signal, parse_legs
+
+
+def test_parse_legs_normalizes():
+    legs = parse_legs([{"symbol": " mstu ", "side": "SELL", "quantity": 10.0}])
+    assert legs == [{"symbol": "MSTU", "side": "sell", "quantity": 10}]
+
+
+@pytest.mark.parametrize("quantity", [0, -1, 1.5, True, "1", float("inf"), float("nan")])
+def test_parse_legs_rejects_bad_quantity(quantity):
+    with pytest.raises(ValueError):
+        parse_legs([{"symbol": "MSTU", "side": "buy", "quantity": quantity}])
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Fake order functions that record when each leg starts and ends."""
+    state = SimpleNamespace(events=[], failing=set(), positions=[{"symbol": "MSTU", "quantity": 10}])
+
+    async def get_account_info():
+        return {"account_id": "A", "positions": state.positions, "cash_balance": 0.0}
+
+    async def place(side, symbol, quantity, initialize):
+        assert initialize is False
+        state.events.append(("start", side, symbol, quantity))
+        await asyncio.sleep(0.01)
+        state.events.append(("end", side, symbol, quantity))
+        return symbol not in state.failing
+
+    async def close_position(account_id, symbol, quantity, initialize=True):
+        return await place("sell", symbol, quantity, initialize)
+
+    async def buy_stock(account_id, symbol, quantity, max_retries=1, initialize=True):
+        return await place("buy", symbol, quantity, initialize)
+
+    monkeypatch.setattr(trading_logic, "get_account_info", get_account_info)
+    monkeypatch.setattr(trading_logic, "close_position", close_position)
+    monkeypatch.setattr(trading_logic, "buy_stock", buy_stock)
+    return state
+
+
+def run_batch(legs):
+    return asyncio.run(handle_batch_signal(parse_legs(legs)))
+
+
+def test_batch_sells_before_buys(broker):
+    result = run_batch([
+        {"symbol": "MSTZ", "side": "buy", "quantity": 5},
+        {"symbol": "MSTU", "side": "sell", "quantity": 10},
+    ])
+
+    assert result["status"] == "success"
+    assert [leg["symbol"] for leg in result["legs"]] == ["MSTZ", "MSTU"]
+    assert broker.events == [
+        ("start", "sell", "MSTU", 10),
+        ("end", "sell", "MSTU", 10),
+        ("start", "buy", "MSTZ", 5),
+        ("end", "buy", "MSTZ", 5),
+    ]
+
+
+def test_batch_same_symbol_in_order_other_symbols_concurrent(broker):
+    run_batch([
+        {"symbol": "A", "side": "buy", "quantity": 1},
+        {"symbol": "A", "side": "buy", "quantity": 2},
+        {"symbol": "B", "side": "buy", "quantity": 1},
+    ])
+
+    events = broker.events
+    assert events.index(("end", "buy", "A", 1)) < events.index(("start", "buy", "A", 2))
+    assert events.index(("start", "buy", "B", 1)) < events.index(("end", "buy", "A", 1))
+
+
+def test_batch_skips_buys_when_a_sell_fails(broker):
+    broker.failing.add("MSTU")
+    result = run_batch([
+        {"symbol": "MSTU", "side": "sell", "quantity": 10},
+        {"symbol": "MSTZ", "side": "buy", "quantity": 5},
+    ])
+
+    assert [leg["status"] for leg in result["legs"]] == ["error", "skipped"]
+    assert result["status"] == "error"
+    assert not any(event[1] == "buy" for event in broker.events)
+
+
+def test_batch_skips_buys_when_sell_exceeds_position(broker):
+    result = run_batch([
+        {"symbol": "MSTU", "side": "sell", "quantity": 11},
+        {"symbol": "MSTZ", "side": "buy", "quantity": 5},
+    ])
+
+    assert [leg["status"] for leg in result["legs"]] == ["error", "skipped"]
+    assert broker.events == []
+
+
+@pytest.mark.parametrize("failing, expected", [
+    (set(), "success"),
+    ({"MSTZ"}, "partial"),
+    ({"MSTZ", "QQQ"}, "error"),
+])
+def test_batch_status(broker, failing, expected):
+    broker.failing.update(failing)
+    result = run_batch([
+        {"symbol": "MSTZ", "side": "buy", "quantity": 5},
+        {"symbol": "QQQ", "side": "buy", "quantity": 1},
+    ])
+
+    assert result["status"] == expected
+    assert result["message"] == f"{2 - len(failing)} of 2 legs succeeded"
@@ -1,10 +1,12 @@
 import os
 import asyncio
 import logging
+import math
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from tastytrade_sdk import Tastytrade
 from api_logger import APILogger
+from dry_run import dry_run_enabled, get_dry_run_client
 
 # Configure logging
 logging.basicConfig(
@@ -19,6 +21,10 @@ api_logger = APILogger()
 # Global TastyTrade client
 tasty = None
 
+# Batch webhook limits
+MAX_BATCH_LEGS = 10
+LEG_SIDES = ("buy", "sell")
+
 async def safe_api_call(endpoint, method, api_call, *args, **kwargs):
     """Safely make API calls with logging."""
     try:
@@ -29,8 +35,8 @@ async def safe_api_call(endpoint, method, api_call, *args, **kwargs):
         }
         api_logger.log_tastytrade_api(endpoint, method, request_data=request_data)
         
-        # Make the API call
-        response = api_call(*args, **kwargs)
+        # Make the API call off the event loop; the SDK is synchronous
+        response = await asyncio.to_thread(api_call, *args, **kwargs)
         
         # Log the successful response
         response_data = None
@@ -73,6 +79,10 @@ async def initialize_tastytrade() -> bool:
     """Initialize TastyTrade client."""
     global tasty
     
+    if dry_run_enabled():
+        tasty = get_dry_run_client()
+        return True
+    
     username = os.getenv("TASTYTRADE_USERNAME")
     password = os.getenv("TASTYTRADE_PASSWORD")
     
@@ -147,9 +157,10 @@ async def get_account_info() -> Dict:
         "cash_balance": cash_balance
     }
 
-async def get_stock_price(symbol: str) -> float:
+async def get_stock_price(symbol: str, initialize: bool = True) -> float:
     """Get stock price for a given symbol."""
-    await initialize_tastytrade()
+    if initialize:
+        await initialize_tastytrade()
     
     # First try to get a quote
     quotes_response = await safe_api_call(
@@ -171,9 +182,10 @@ async def get_stock_price(symbol: str) -> float:
     logger.warning(f"Could not get price from quotes for {symbol}, trying alternative method")
     raise ValueError(f"Could not get price for {symbol}")
 
-async def close_position(account_id: str, symbol: str, quantity: int) -> bool:
+async def close_position(account_id: str, symbol: str, quantity: int, initialize: bool = True) -> bool:
     """Close a position by selling shares."""
-    await initialize_tastytrade()
+    if initialize:
+        await initialize_tastytrade()
     
     # Create an order to sell shares
     order_data = {
@@ -211,9 +223,10 @@ async def close_position(account_id: str, symbol: str, quantity: int) -> bool:
     status = order_status_response.get('status')
     return status == 'Filled'
 
-async def buy_stock(account_id: str, symbol: str, quantity: int, max_retries: int = 1) -> bool:
+async def buy_stock(account_id: str, symbol: str, quantity: int, max_retries: int = 1, initialize: bool = True) -> bool:
     """Buy stock by creating a market order."""
-    await initialize_tastytrade()
+    if initialize:
+        await initialize_tastytrade()
     
     # Create a buy order
     order_data = {
@@ -256,7 +269,7 @@ async def buy_stock(account_id: str, symbol: str, quantity: int, max_retries: in
         logger.info(f"Order {order_id} not filled, retrying with limit order...")
         
         # Get current stock price
-        stock_price = await get_stock_price(symbol)
+        stock_price = await get_stock_price(symbol, initialize=initialize)
         
         # Create a limit order with 1% higher price to ensure it gets filled
         limit_price = round(stock_price * 1.01, 2)
@@ -389,4 +402,140 @@ async def handle_trading_signal(signal: str) -> Dict:
         return {
             "status": "error",
             "message": f"Error processing trading signal: {str(e)}"
-        } 
\ No newline at end of file
+        }
+
+def parse_legs(legs: Any) -> List[Dict]:
+    """Validate and normalize the legs of a batch webhook payload."""
+    if not isinstance(legs, list) or not legs:
+        raise ValueError("legs must be a non-empty list")
+    if len(legs) > MAX_BATCH_LEGS:
+        raise ValueError(f"At most {MAX_BATCH_LEGS} legs are allowed per batch")
+    
+    parsed = []
+    for index, leg in enumerate(legs):
+        if not isinstance(leg, dict):
+            raise ValueError(f"Leg {index}: must be an object")
+        
+        symbol = leg.get("symbol")
+        if not isinstance(symbol, str) or not symbol.strip():
+            raise ValueError(f"Leg {index}: symbol is required")
+        
+        side = str(leg.get("side", "")).lower()
+        if side not in LEG_SIDES:
+            raise ValueError(f"Leg {index}: side must be one of {', '.join(LEG_SIDES)}")
+        
+        quantity = leg.get("quantity")
+        if (isinstance(quantity, bool) or not isinstance(quantity, (int, float)) or not math.isfinite(quantity)
+                or quantity != int(quantity) or quantity <= 0):
+            raise ValueError(f"Leg {index}: quantity must be a positive whole number")
+        
+        parsed.append({
+            "symbol": symbol.strip().upper(),
+            "side": side,
+            "quantity": int(quantity)
+        })
+    return parsed
+
+async def execute_leg(account_id: str, held: Dict[str, float], leg: Dict) -> Dict:
+    """Execute a single batch leg against a shared account snapshot."""
+    symbol = leg["symbol"]
+    quantity = leg["quantity"]
+    result = dict(leg)
+    
+    try:
+        if leg["side"] == "sell":
+            if held.get(symbol, 0) < quantity:
+                result.update({
+                    "status": "error",
+                    "message": f"Cannot sell {quantity} shares of {symbol}, holding {held.get(symbol, 0):g}"
+                })
+                return result
+            
+            logger.info(f"Selling {quantity} shares of {symbol}")
+            success = await close_position(account_id, symbol, quantity, initialize=False)
+            verb = "sold" if success else "sell"
+        else:
+            logger.info(f"Buying {quantity} shares of {symbol}")
+            success = await buy_stock(account_id, symbol, quantity, initialize=False)
+            verb = "bought" if success else "buy"
+        
+        if success:
+            result.update({
+                "status": "success",
+                "message": f"Successfully {verb} {quantity} shares of {symbol}"
+            })
+        else:
+            result.update({
+                "status": "error",
+                "message": f"Failed to {verb} {quantity} shares of {symbol}"
+            })
+    except Exception as e:
+        logger.error(f"Error executing {leg['side']} leg for {symbol}: {str(e)}")
+        result.update({
+            "status": "error",
+            "message": f"Error executing leg: {str(e)}"
+        })
+    return result
+
+async def _execute_phase(account_id: str, held: Dict[str, float], legs: List[Tuple[int, Dict]], results: List) -> None:
+    """Execute legs concurrently across symbols, in order within a symbol."""
+    by_symbol: Dict[str, List[Tuple[int, Dict]]] = {}
+    for index, leg in legs:
+        by_symbol.setdefault(leg["symbol"], []).append((index, leg))
+    
+    async def run_symbol(symbol_legs: List[Tuple[int, Dict]]) -> None:
+        for index, leg in symbol_legs:
+            results[index] = await execute_leg(account_id, held, leg)
+            if leg["side"] == "sell" and results[index]["status"] == "success":
+                held[leg["symbol"]] -= leg["quantity"]
+    
+    await asyncio.gather(*(run_symbol(symbol_legs) for symbol_legs in by_symbol.values()))
+
+async def handle_batch_signal(legs: List[Dict]) -> Dict:
+    """Handle a batch of legs from one account snapshot, closes before opens."""
+    try:
+        # Logs in and fetches the account once for the whole batch
+        account_info = await get_account_info()
+    except Exception as e:
+        logger.error(f"Error fetching account for batch signal: {str(e)}")
+        return {
+            "status": "error",
+            "message": f"Error processing batch signal: {str(e)}"
+        }
+    
+    account_id = account_info["account_id"]
+    held: Dict[str, float] = {}
+    for position in account_info.get("positions", []):
+        try:
+            held[position.get("symbol")] = float(position.get("quantity", 0))
+        except (TypeError, ValueError):
+            continue
+    
+    results: List[Optional[Dict]] = [None] * len(legs)
+    indexed = list(enumerate(legs))
+    
+    # Sells first so their proceeds are available to the buys
+    sells = [(i, leg) for i, leg in indexed if leg["side"] == "sell"]
+    buys = [(i, leg) for i, leg in indexed if leg["side"] == "buy"]
+    await _execute_phase(account_id, held, sells, results)
+    
+    # A failed close would leave both sides of a rotation open, so don't open anything
+    if any(results[i]["status"] != "success" for i, _ in sells):
+        for i, leg in buys:
+            results[i] = dict(leg, status="skipped", message="Skipped because a sell leg failed")
+    else:
+        await _execute_phase(account_id, held, buys, results)
+    
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    if succeeded == len(results):
+        status = "success"
+    elif succeeded:
+        status = "partial"
+    else:
+        status = "error"
+    
+    return {
+        "status": status,
+        "message": f"{succeeded} of {len(results)} legs succeeded",
+        "legs": results
+    }